@@ -3,9 +3,10 @@
 Convert a spreadsheet of GA4GH service registrations into a JSON array
 compatible with the GA4GH Service Registry "services" resource.
 
-Implements Option B: json.dump(..., default=_json_default) to serialize
-pandas.Timestamp/datetime objects as ISO 8601 strings (and stringify
-unknown types as a last resort).
+Serializes with orjson, which writes datetime/date/numpy values natively
+(dates as "YYYY-MM-DD"); orjson.dumps(..., default=_json_default) covers
+pandas.Timestamp as ISO 8601 strings (and stringifies unknown types as a
+last resort).
 
 Usage:
   python generate_registry_json.py \
@@ -29,27 +30,71 @@ Example mapping keys can include:
 """
 
 import argparse
-import json
+import importlib.util
 import os
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional
 
-import datetime as dt
 import numpy as np
+import orjson
 import pandas as pd
 import yaml
 
+try:  # libyaml C bindings when available
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Prefer the Rust-based calamine Excel reader when python-calamine is installed
+# (pandas supports it from 2.2); otherwise let pandas pick its default
+# (openpyxl, already opened read-only).
+_PANDAS_VERSION = tuple(int(p) for p in pd.__version__.split(".")[:2])
+_EXCEL_ENGINE: Optional[str] = (
+    "calamine" if _PANDAS_VERSION >= (2, 2) and importlib.util.find_spec("python_calamine") else None
+)
+
 
 # ----------------------------
 # JSON helpers
 # ----------------------------
 def _json_default(o: Any) -> Any:
-    """json.dump fallback: datetimes -> ISO 8601; everything else -> str."""
-    if isinstance(o, (pd.Timestamp, dt.datetime, dt.date)):
-        return pd.to_datetime(o).isoformat()
+    """orjson fallback: pandas.Timestamp -> ISO 8601; everything else -> str."""
+    if isinstance(o, pd.Timestamp):
+        return o.isoformat()
     # last resort: stringify unknowns
     return str(o)
 
 
+_JSON_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _write_json_array(f: BinaryIO, records: Iterable[dict], array_name: Optional[str]) -> int:
+    """Stream records to f as a JSON array (or {array_name: [...]}) one at a time.
+
+    Produces the same bytes as serializing the whole structure with
+    OPT_INDENT_2, without holding every record in memory. Returns the count.
+    """
+    depth = 2 if array_name else 1
+    pad = b"\n" + b"  " * depth
+    if array_name:
+        # JSON object keys must be strings (e.g. YAML "array_name: 2024" or "yes");
+        # stringify them the way json.dump does (True -> "true")
+        key = str(array_name).lower() if isinstance(array_name, bool) else str(array_name)
+        f.write(b"{\n  " + orjson.dumps(key) + b": [")
+    else:
+        f.write(b"[")
+
+    count = 0
+    for rec in records:
+        if count:
+            f.write(b",")
+        f.write(pad + orjson.dumps(rec, default=_json_default, option=_JSON_OPTS).replace(b"\n", pad))
+        count += 1
+
+    closing = b"\n" + b"  " * (depth - 1) + b"]" if count else b"]"
+    f.write(closing + (b"\n}" if array_name else b""))
+    return count
+
+
 # ----------------------------
 # Dataframe helpers
 # ----------------------------
@@ -57,29 +102,41 @@ def load_dataframe(path: str, sheet: Optional[str]) -> pd.DataFrame:
     """Load Excel/CSV/TSV into a DataFrame."""
     lower = path.lower()
     if lower.endswith((".xlsx", ".xls")):
-        return pd.read_excel(path, sheet_name=sheet)
+        return pd.read_excel(path, sheet_name=sheet, engine=_EXCEL_ENGINE)
     if lower.endswith(".csv"):
         return pd.read_csv(path)
     if lower.endswith(".tsv"):
         return pd.read_csv(path, sep="\t")
     # Try Excel by default if unknown
-    return pd.read_excel(path, sheet_name=sheet)
+    return pd.read_excel(path, sheet_name=sheet, engine=_EXCEL_ENGINE)
+
+
+def _is_string_column(s: pd.Series) -> bool:
+    """True if the column can hold string cells (string dtype, or object with strings)."""
+    if isinstance(s.dtype, pd.StringDtype):
+        return True
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in ("string", "mixed", "mixed-integer")
+
+
+def _strip_string_columns(df: pd.DataFrame, cols: list[str]) -> tuple[pd.DataFrame, set[str]]:
+    """Strip whitespace from string cells of the given columns in one vectorized pass.
+
+    Non-string cells (numbers, timestamps, NaN) are left untouched. Also
+    returns which of the columns hold strings, i.e. may contain "" blanks.
+    """
+    stripped: Dict[str, pd.Series] = {}
+    for c in dict.fromkeys(cols):
+        s = df[c]
+        if not _is_string_column(s):
+            continue
+        st = s.str.strip()
+        stripped[c] = st.where(st.notna(), s)
+    return (df.assign(**stripped) if stripped else df), set(stripped)
 
 
 # ----------------------------
 # Dict utilities
 # ----------------------------
-def _set_deep(d: Dict[str, Any], path: str, value: Any) -> None:
-    """Set a value in nested dict using dot path, creating nested dicts as needed."""
-    keys = path.split(".")
-    cur = d
-    for k in keys[:-1]:
-        if k not in cur or not isinstance(cur[k], dict):
-            cur[k] = {}
-        cur = cur[k]
-    cur[keys[-1]] = value
-
-
 def _slugify(key: str) -> str:
     return "".join(ch.lower() if ch.isalnum() else "-" for ch in key).strip("-")
 
@@ -87,81 +144,134 @@ def _slugify(key: str) -> str:
 # ----------------------------
 # Main transform
 # ----------------------------
+def _is_const_rule(rule: Any) -> bool:
+    return isinstance(rule, dict) and "const" in rule
+
+
+def _compile_mapping(
+    mapping: Dict[str, Any], col_idx: Dict[str, int], n_cols: int, str_pos: set[int]
+) -> tuple[list[tuple[tuple[str, ...], str, int, bool]], tuple]:
+    """Resolve mapping rules once into (parent_keys, leaf_key, position, may_be_blank).
+
+    Rules stay in mapping order. Dot paths are split up front
+    ("type.version" -> (("type",), "version")). Column rules point into the
+    itertuples row; constants are collected into a tuple that is appended
+    after the row's columns, so every rule becomes a plain positional lookup.
+    may_be_blank is set only for string columns (positions in str_pos), so
+    numeric/datetime columns and constants skip the "" comparison. Rules for
+    absent columns and empty constants are dropped since they can never
+    yield a value.
+    """
+    rules: list[tuple[tuple[str, ...], str, int, bool]] = []
+    consts: list[Any] = []
+    for target_path, rule in mapping.items():
+        *parent, leaf = target_path.split(".")
+        if _is_const_rule(rule):
+            val = rule["const"]
+            if isinstance(val, str):
+                val = val.strip()
+            if val is None or val == "":
+                continue
+            rules.append((tuple(parent), leaf, n_cols + len(consts), False))
+            consts.append(val)
+        elif rule in col_idx:
+            i = col_idx[rule]
+            rules.append((tuple(parent), leaf, i, i in str_pos))
+    return rules, tuple(consts)
+
+
 def build_records(
     df: pd.DataFrame,
     mapping: Dict[str, Any],
     passthrough_cols: list[str],
     required_fields: list[str],
     drop_empty: bool,
-) -> list[dict]:
-    records: list[dict] = []
-
-    for _, row in df.iterrows():
-        # Skip rows missing required spreadsheet fields (if configured)
-        if required_fields:
-            missing = [
-                c for c in required_fields
-                if pd.isna(row.get(c, None)) or str(row.get(c)).strip() == ""
-            ]
-            if missing:
-                continue
-
+) -> Iterator[dict]:
+    """Yield one GA4GH service object per (valid) spreadsheet row."""
+    # Skip rows missing required spreadsheet fields (if configured), using one
+    # vectorized mask over the frame rather than per-row checks.
+    if required_fields:
+        # A required column that is absent from the sheet makes every row "missing"
+        if any(c not in df.columns for c in required_fields):
+            return
+        mask = pd.Series(True, index=df.index)
+        for c in required_fields:
+            col = df[c]
+            mask &= col.notna() & (col.astype(str).str.strip() != "")
+        df = df.loc[mask]
+
+    # Resolve column positions once so the row loop is plain tuple indexing
+    # (itertuples avoids building a pandas.Series per row like iterrows does).
+    col_idx = {c: i for i, c in enumerate(df.columns)}
+
+    n_cols = len(df.columns)
+
+    # Strip every referenced string column up front instead of per cell; only
+    # those string columns can hold "" blanks
+    used_cols = [rule for rule in mapping.values() if not _is_const_rule(rule) and rule in col_idx]
+    used_cols += [col for col in passthrough_cols if col in col_idx]
+    df, str_cols = _strip_string_columns(df, used_cols)
+    str_pos = {i for i, c in enumerate(df.columns) if c in str_cols}
+
+    mapping_rules, consts = _compile_mapping(mapping, col_idx, n_cols, str_pos)
+
+    # Passthrough columns resolve to (x-extra key, position, drop_blank); slugs
+    # are computed once
+    passthrough_rules = [
+        (_slugify(col), col_idx[col], drop_empty and col_idx[col] in str_pos)
+        for col in passthrough_cols if col in col_idx
+    ]
+
+    # Keys holding a "Geolocation (latitude, longitude)" style value, if any
+    geo_keys = list(dict.fromkeys(
+        key for key, _, _ in passthrough_rules if "geolocation-latitude--longitude" in key
+    ))
+
+    for row in df.itertuples(index=False, name=None):
         obj: Dict[str, Any] = {}
 
-        # Apply mapping
-        for target_path, rule in mapping.items():
-            if isinstance(rule, dict) and "const" in rule:
-                val = rule["const"]
-            else:
-                col = rule
-                val = row.get(col, None)
-
-            # Normalize "empties"
-            if pd.isna(val):
-                val = None
+        # Apply mapping (constants sit after the sheet columns)
+        values = row + consts
+        for parent, leaf, i, may_be_blank in mapping_rules:
+            val = values[i]
 
-            if isinstance(val, str):
-                val = val.strip()
-
-            if drop_empty and (val is None or val == ""):
+            # Strings are already stripped; "empties" are never set
+            if pd.isna(val) or (may_be_blank and val == ""):
                 continue
 
-            if val is not None and val != "":
-                _set_deep(obj, target_path, val)
+            # Non-dict intermediates are replaced, so a later rule wins
+            cur = obj
+            for k in parent:
+                nxt = cur.get(k)
+                if not isinstance(nxt, dict):
+                    nxt = cur[k] = {}
+                cur = nxt
+            cur[leaf] = val
 
         # Optional: add x-extra with passthrough columns from the sheet
         xextra: Dict[str, Any] = {}
-        for col in passthrough_cols:
-            val = row.get(col, None)
-            if pd.isna(val) or val is None:
+        for key, i, drop_blank in passthrough_rules:
+            val = row[i]
+            if pd.isna(val) or (drop_blank and val == ""):
                 continue
-            if isinstance(val, str):
-                val = val.strip()
-                if drop_empty and val == "":
-                    continue
-            key = _slugify(col)
             xextra[key] = val
 
         # Helpful special-case: parse a "Geolocation (latitude, longitude)" style column
         # to structured x-extra values (lat/lon floats). Keep original too.
-        for k in list(xextra.keys()):
-            if "geolocation-latitude--longitude" in k and isinstance(xextra[k], str):
-                raw = xextra[k]
-                try:
-                    parts = [p.strip() for p in str(raw).split(",")]
-                    if len(parts) == 2:
-                        lat = float(parts[0])
-                        lon = float(parts[1])
-                        xextra["geolocation"] = {"lat": lat, "lon": lon}
-                except Exception:
-                    pass
+        for k in geo_keys:
+            raw = xextra.get(k)
+            if isinstance(raw, str):
+                parts = raw.split(",", 1)
+                if len(parts) == 2:
+                    try:
+                        xextra["geolocation"] = {"lat": float(parts[0]), "lon": float(parts[1])}
+                    except ValueError:
+                        pass
 
         if xextra:
             obj.setdefault("x-extra", {}).update(xextra)
 
-        records.append(obj)
-
-    return records
+        yield obj
 
 
 # ----------------------------
@@ -179,7 +289,7 @@ def main() -> None:
 
     # Load config
     with open(args.config, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f) or {}
+        cfg = yaml.load(f, Loader=_YamlLoader) or {}
 
     mapping: Dict[str, Any] = cfg.get("mapping", {})
     passthrough_cols: list[str] = cfg.get("passthrough_columns", [])
@@ -189,7 +299,7 @@ def main() -> None:
     # Load data
     df = load_dataframe(args.input, args.sheet)
 
-    # Build JSON records
+    # Build JSON records lazily; they are serialized as they are produced
     records = build_records(
         df=df,
         mapping=mapping,
@@ -198,13 +308,22 @@ def main() -> None:
         drop_empty=args.drop_empty,
     )
 
-    # Write output; Option B: use default=_json_default to serialize datetimes
-    out = {array_name: records} if array_name else records
+    # Write output; orjson emits UTF-8 bytes and only calls _json_default for
+    # types it cannot serialize natively (e.g. pandas.Timestamp). Records are
+    # produced lazily, so stream into a temp file and only replace the output
+    # once every record was written; a failure leaves any previous output intact.
     os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2, ensure_ascii=False, default=_json_default)
-
-    print(f"Wrote {len(records)} records to {args.output}")
+    tmp_output = args.output + ".tmp"
+    try:
+        with open(tmp_output, "wb") as f:
+            count = _write_json_array(f, records, array_name)
+        os.replace(tmp_output, args.output)
+    except BaseException:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
+
+    print(f"Wrote {count} records to {args.output}")
 
 
 if __name__ == "__main__":
@@ -1,46 +1,228 @@
 import requests
-from jinja2 import Template
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from jinja2 import Environment, StrictUndefined
+from concurrent.futures import ThreadPoolExecutor
 import argparse
+import asyncio
 import json
+import orjson
+import os
+import time
+
+try:  # optional: only needed for --async
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 REGISTRY_URL = "https://registry.ga4gh.org/v1/services"
 
+# Local copy of the registry response plus its HTTP validators (ETag/Last-Modified)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ga4gh-registry")
+REGISTRY_CACHE_FILE = os.path.join(CACHE_DIR, "services.json")
+REGISTRY_CACHE_META = os.path.join(CACHE_DIR, "services.meta.json")
+
+# Live service-info responses are reused between runs for this many seconds
+LIVE_INFO_CACHE_FILE = os.path.join(CACHE_DIR, "live_service_info.json")
+LIVE_INFO_TTL = 3600
+
 SERVICE_INFO_PATHS = {
     "drs": "/ga4gh/drs/v1/service-info",
     # Add more artifact types here as needed
 }
 
+# Number of live service-info requests made concurrently (threads / --async)
+MAX_WORKERS = 32
+ASYNC_CONCURRENCY = 64
+
+# Shared keep-alive session: pooled connections sized for the worker pool,
+# with a couple of quick retries on transient gateway errors. Read timeouts
+# are not retried so an unresponsive service costs one timeout, not three.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=2, connect=1, read=0, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file so readers never see a partial file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _load_registry_validators():
+    """Return the cached ETag/Last-Modified headers, or {} if there is no usable cache."""
+    if not os.path.exists(REGISTRY_CACHE_FILE):
+        return {}
+    try:
+        with open(REGISTRY_CACHE_META, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_registry_cache(response):
+    """Store the registry body and its validators; caching is best-effort."""
+    validators = {}
+    if response.headers.get("ETag"):
+        validators["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["last_modified"] = response.headers["Last-Modified"]
+    if not validators:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_atomic(REGISTRY_CACHE_FILE, response.content)
+        _write_atomic(REGISTRY_CACHE_META, json.dumps(validators).encode("utf-8"))
+    except OSError:
+        pass
+
 def fetch_services():
-    """Fetch JSON data from GA4GH service registry."""
-    response = requests.get(REGISTRY_URL)
+    """Fetch JSON data from GA4GH service registry, reusing the cached copy if unchanged."""
+    validators = _load_registry_validators()
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = SESSION.get(REGISTRY_URL, headers=headers)
+    if response.status_code == 304:
+        try:
+            with open(REGISTRY_CACHE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Cached body is unusable; fetch it again unconditionally
+            response = SESSION.get(REGISTRY_URL)
     response.raise_for_status()
+    _save_registry_cache(response)
     return response.json()
 
-def fetch_live_service_info(base_url, artifact):
-    """Fetch live service-info JSON from the given base URL based on artifact."""
+def _service_info_url(base_url, artifact):
+    """Return the service-info URL for the artifact, or None if it is not known."""
     path = SERVICE_INFO_PATHS.get(artifact.lower())
     if not path:
+        return None
+    return base_url.rstrip("/") + path
+
+def fetch_live_service_info(base_url, artifact):
+    """Fetch live service-info JSON from the given base URL based on artifact."""
+    service_info_url = _service_info_url(base_url, artifact)
+    if not service_info_url:
         return None, None
-    service_info_url = base_url.rstrip("/") + path
     try:
-        response = requests.get(service_info_url, timeout=5)
+        response = SESSION.get(service_info_url, timeout=5)
         response.raise_for_status()
         return response.json(), service_info_url
     except Exception as e:
         return {"error": str(e)}, service_info_url
 
-def extract_service_info(services, artifact_filter=None):
+async def _fetch_live_service_info_async(session, sem, base_url, artifact):
+    """aiohttp counterpart of fetch_live_service_info, bounded by sem."""
+    service_info_url = _service_info_url(base_url, artifact)
+    if not service_info_url:
+        return None, None
+    async with sem:
+        try:
+            async with session.get(service_info_url) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None), service_info_url
+        except Exception as e:
+            return {"error": str(e) or type(e).__name__}, service_info_url
+
+async def _gather_live_service_info(targets):
+    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        return await asyncio.gather(*(
+            _fetch_live_service_info_async(session, sem, base_url, artifact)
+            for base_url, artifact in targets
+        ))
+
+def fetch_all_live_service_info(targets, use_async=False):
+    """Fetch live service-info for each (base_url, artifact) pair, in order.
+
+    Uses the shared session on a thread pool, or an asyncio/aiohttp event
+    loop when use_async is set.
+    """
+    if use_async:
+        return asyncio.run(_gather_live_service_info(targets))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(lambda t: fetch_live_service_info(*t), targets))
+
+def _live_info_key(base_url, artifact):
+    return f"{artifact.lower()}|{base_url}"
+
+def _load_live_info_cache():
+    """Return the non-expired cached live service-info entries."""
+    try:
+        with open(LIVE_INFO_CACHE_FILE, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, dict):
+        return {}
+    now = time.time()
+    return {
+        k: v for k, v in entries.items()
+        if isinstance(v, dict) and "info" in v and "url" in v
+        and isinstance(v.get("fetched_at"), (int, float)) and now - v["fetched_at"] < LIVE_INFO_TTL
+    }
+
+def _save_live_info_cache(entries):
+    """Persist live service-info entries; caching is best-effort."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_atomic(LIVE_INFO_CACHE_FILE, json.dumps(entries).encode("utf-8"))
+    except OSError:
+        pass
+
+def extract_service_info(services, artifact_filter=None, use_async=False):
     """Extract relevant fields and filter by artifact if specified."""
-    extracted = []
+    # (idx, service, artifact, version) for each service; filtering happens
+    # before any live service-info is requested
+    wanted = artifact_filter.lower() if artifact_filter else None
+    targets = []
     for idx, service in enumerate(services):
-        artifact = service.get("type", {}).get("artifact", "N/A")
-        version = service.get("type", {}).get("version", "N/A")
-
-        if artifact_filter and artifact.lower() != artifact_filter.lower():
+        svc_type = service.get("type") or {}
+        artifact = svc_type.get("artifact", "N/A")
+        if wanted and artifact.lower() != wanted:
             continue
+        targets.append((idx, service, artifact, svc_type.get("version", "N/A")))
+
+    # Serve recently fetched service-info from the cache; fetch the rest
+    cache = _load_live_info_cache()
+    results = [None] * len(targets)
+    pending = []
+    for pos, (_, service, artifact, _) in enumerate(targets):
+        entry = cache.get(_live_info_key(service.get("url", ""), artifact))
+        if entry:
+            results[pos] = (entry["info"], entry["url"])
+        else:
+            pending.append(pos)
 
+    fetched = fetch_all_live_service_info(
+        [(targets[pos][1].get("url", ""), targets[pos][2]) for pos in pending],
+        use_async=use_async,
+    ) if pending else []
+
+    # Only successful responses are cached so failing services are retried next run
+    now = time.time()
+    for pos, (live_info, service_info_url) in zip(pending, fetched):
+        results[pos] = (live_info, service_info_url)
+        if isinstance(live_info, dict) and "error" not in live_info:
+            _, service, artifact, _ = targets[pos]
+            cache[_live_info_key(service.get("url", ""), artifact)] = {
+                "fetched_at": now, "info": live_info, "url": service_info_url,
+            }
+    if pending:
+        _save_live_info_cache(cache)
+
+    extracted = []
+    for (idx, service, artifact, version), (live_info, service_info_url) in zip(targets, results):
         base_url = service.get("url", "")
-        live_info, service_info_url = fetch_live_service_info(base_url, artifact)
         live_version = live_info.get("type", {}).get("version") if isinstance(live_info, dict) else None
         version_mismatch = live_version and (live_version != version)
 
@@ -53,14 +235,12 @@ def extract_service_info(services, artifact_filter=None):
             "url": service_info_url or base_url,
             "live_version": live_version or "N/A",
             "version_mismatch": version_mismatch,
-            "raw_json": json.dumps(service, indent=2)
+            "raw_obj": service
         }
         extracted.append(info)
     return extracted
 
-def generate_html(services_info, output_file="registry_summary.html"):
-    """Render HTML summary page using a Jinja2 template."""
-    template_str = """
+TEMPLATE_STR = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -110,7 +290,7 @@ def generate_html(services_info, output_file="registry_summary.html"):
                 <td><span class="json-toggle" onclick="toggleJsonRow('{{ svc.id }}')">Show JSON registration</span></td>
             </tr>
             <tr id="{{ svc.id }}" class="json-row">
-                <td colspan="7"><pre><code class="language-json">{{ svc.raw_json }}</code></pre></td>
+                <td colspan="7"><pre><code class="language-json">{{ svc.raw_obj | jsonpp }}</code></pre></td>
             </tr>
             {% endfor %}
         </table>
@@ -118,21 +298,31 @@ def generate_html(services_info, output_file="registry_summary.html"):
     </body>
     </html>
     """
-    template = Template(template_str)
-    html_output = template.render(services=services_info)
 
+# Compiled once at import and streamed to disk when rendering
+_ENV = Environment(autoescape=True, undefined=StrictUndefined)
+# Registrations are pretty-printed with orjson while the page renders
+_ENV.filters["jsonpp"] = lambda o: orjson.dumps(o, option=orjson.OPT_INDENT_2).decode()
+_TEMPLATE = _ENV.from_string(TEMPLATE_STR)
+
+def generate_html(services_info, output_file="registry_summary.html"):
+    """Render HTML summary page using a Jinja2 template."""
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write(html_output)
+        f.writelines(_TEMPLATE.generate(services=services_info))
     print(f"HTML summary written to: {output_file}")
 
 def main():
     parser = argparse.ArgumentParser(description="Generate GA4GH Registry HTML summary")
     parser.add_argument("--artifact", type=str, help="Filter services by artifact type")
     parser.add_argument("--output", type=str, default="registry_summary.html", help="Output HTML file name")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Fetch live service-info with asyncio/aiohttp instead of threads")
     args = parser.parse_args()
+    if args.use_async and aiohttp is None:
+        parser.error("--async requires aiohttp (pip install aiohttp)")
 
     services = fetch_services()
-    services_info = extract_service_info(services, artifact_filter=args.artifact)
+    services_info = extract_service_info(services, artifact_filter=args.artifact, use_async=args.use_async)
     generate_html(services_info, output_file=args.output)
 
 if __name__ == "__main__":
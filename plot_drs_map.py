@@ -3,28 +3,29 @@ import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
-import math
 
 # --- Load TSV with Lat_Long column ---
 df = pd.read_csv("drs_servers.tsv", sep="\t")
 
-# Split Lat_Long into Lat and Lon
-lat_lon = df["Lat_Long"].str.split(",", expand=True)
-df["Lat"] = pd.to_numeric(lat_lon[0].str.strip(), errors="coerce")
-df["Lon"] = pd.to_numeric(lat_lon[1].str.strip(), errors="coerce")
+# Split Lat_Long into Lat and Lon (float32 is plenty for plotting)
+lat_lon = df["Lat_Long"].str.split(",", n=1, expand=True)
+df["Lat"] = pd.to_numeric(lat_lon[0].str.strip(), errors="coerce", downcast="float")
+df["Lon"] = pd.to_numeric(lat_lon[1].str.strip(), errors="coerce", downcast="float")
 
 # Drop any invalid rows
 df = df.dropna(subset=["Lat", "Lon", "TotalSize_GB"])
 
 # --- Group near-duplicate geolocations (for decluttering) ---
-def round_to(x, step):
-    return np.round(x / step) * step
-
 grouping_precision = 0.2  # degrees
-df["_lat_bin"] = round_to(df["Lat"], grouping_precision)
-df["_lon_bin"] = round_to(df["Lon"], grouping_precision)
+bins = np.round(df[["Lat", "Lon"]].to_numpy() / grouping_precision) * grouping_precision
+df["_lat_bin"] = bins[:, 0]
+df["_lon_bin"] = bins[:, 1]
+
+# Largest first, so each group's positions below come out already size-ordered
+df = df.sort_values("TotalSize_GB", ascending=False, kind="stable").reset_index(drop=True)
 
-groups = df.groupby(["_lat_bin", "_lon_bin"])
+# group key -> integer row positions (no per-group DataFrame is built)
+group_positions = df.groupby(["_lat_bin", "_lon_bin"], sort=False).indices
 
 # --- Circle size scaling ---
 sizes = df["TotalSize_GB"].values
@@ -61,33 +62,43 @@ ax.gridlines(draw_labels=False, linestyle=":", linewidth=0.3, color="gray", zord
 # --- Plot groups with decluttering ---
 base_offset_deg = 2.0
 
-for (_, _), g in groups:
-    g = g.sort_values("TotalSize_GB", ascending=False).reset_index(drop=True)
-    center_lat, center_lon = g.loc[0, "Lat"], g.loc[0, "Lon"]
-    
-    n = len(g)
-    if n == 1:
-        offsets = [(0, 0)]
-    else:
+lat_arr = df["Lat"].to_numpy()
+lon_arr = df["Lon"].to_numpy()
+size_arr = df["_marker_size"].to_numpy()
+
+# Collect all points and draw them with a single scatter call
+all_lon, all_lat, all_size = [], [], []
+
+for positions in group_positions.values():
+    center_lat = lat_arr[positions[0]]
+
+    # Largest stays at the center; the rest are spread evenly on a circle
+    n = len(positions)
+    dlats = np.zeros(n)
+    dlons = np.zeros(n)
+    if n > 1:
         radius = base_offset_deg * (1 + 0.15 * (n - 2))
-        offsets = [(0, 0)]
-        for i in range(1, n):
-            angle = 2 * math.pi * (i-1) / (n-1)
-            dlat = radius * math.cos(angle)
-            dlon = radius * math.sin(angle) / max(math.cos(math.radians(center_lat)), 0.2)
-            offsets.append((dlat, dlon))
-    
-    for (dlat, dlon), (_, row) in zip(offsets, g.iterrows()):
-        lat, lon = row["Lat"] + dlat, row["Lon"] + dlon
-        label = f"{row['Name']} — {int(row['TotalSize_GB']):,} GB"
-        
-        ax.scatter(lon, lat, s=row["_marker_size"], color="blue",
-                   alpha=0.35, transform=ccrs.PlateCarree(), zorder=10)
-        #ax.text(lon, lat, label, fontsize=7, alpha=0.9,
-        #        ha="center", va="bottom", transform=ccrs.PlateCarree(), zorder=11)
+        angles = 2 * np.pi * np.arange(n - 1) / (n - 1)
+        dlats[1:] = radius * np.cos(angles)
+        dlons[1:] = radius * np.sin(angles) / max(np.cos(np.radians(center_lat)), 0.2)
+
+    lats = lat_arr[positions] + dlats
+    lons = lon_arr[positions] + dlons
+    all_lon.append(lons)
+    all_lat.append(lats)
+    all_size.append(size_arr[positions])
+    #for lon, lat, (name, size_gb) in zip(lons, lats, df.loc[positions, ["Name", "TotalSize_GB"]].to_numpy()):
+    #    ax.text(lon, lat, f"{name} — {int(size_gb):,} GB", fontsize=7, alpha=0.9,
+    #            ha="center", va="bottom", transform=ccrs.PlateCarree(), zorder=11)
+
+# Markers are rasterized so the SVG embeds one image instead of a <path> per
+# marker; the base map layers stay vector
+if all_lon:
+    ax.scatter(np.concatenate(all_lon), np.concatenate(all_lat), s=np.concatenate(all_size), color="blue",
+               alpha=0.35, transform=ccrs.PlateCarree(), zorder=10, rasterized=True)
 
 plt.title("DRS Servers — declustered circles with Cartopy")
 plt.tight_layout()
 plt.savefig("drs_world_map_cartopy.png", dpi=300, bbox_inches="tight")
-plt.savefig("drs_world_map_cartopy.svg", bbox_inches="tight")
+plt.savefig("drs_world_map_cartopy.svg", dpi=300, bbox_inches="tight")
 plt.show()
\ No newline at end of file